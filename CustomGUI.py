@@ -7,12 +7,10 @@
 
 import tkinter as tk
 from tkinter import ttk
-import serial
-import time
+from serial_port import get_port
 
 # ------------------- Configure Serial -------------------
-arduino = serial.Serial('COM4', 115200, timeout=2)
-time.sleep(2)  # Wait for Mega reset
+ARDUINO_PORT = 'COM4'   # Opened on the first Send (waits 2 s for Mega reset)
 
 # ------------------- Color Mapping -------------------
 color_dict = {
@@ -26,6 +24,10 @@ color_dict = {
     "Pink": (255,192,203)
 }
 
+# Precomputed per colour: serial command fragment and canvas fill colour
+color_cmd = {name: f",{r},{g},{b}" for name, (r, g, b) in color_dict.items()}
+color_hex = {name: f"#{r:02x}{g:02x}{b:02x}" for name, (r, g, b) in color_dict.items()}
+
 # ------------------- GUI Setup -------------------
 root = tk.Tk()
 root.title("LED Control")
@@ -54,17 +56,13 @@ for i in range(4):
 
 # ------------------- Send Function -------------------
 def send_colors():
-    command = "C"
-    for var in selected_colors:
-        rgb = color_dict[var.get()]
-        command += f",{rgb[0]},{rgb[1]},{rgb[2]}"
-    command += "\n"
+    names = [var.get() for var in selected_colors]
+    command = "C" + "".join(color_cmd[name] for name in names) + "\n"
+    arduino = get_port(ARDUINO_PORT, 115200, timeout=2)
     arduino.write(command.encode('utf-8'))
     # Update GUI LEDs
-    for i, var in enumerate(selected_colors):
-        rgb = color_dict[var.get()]
-        hex_color = f"#{rgb[0]:02x}{rgb[1]:02x}{rgb[2]:02x}"
-        canvas.itemconfig(led_rects[i], fill=hex_color)
+    for rect, name in zip(led_rects, names):
+        canvas.itemconfig(rect, fill=color_hex[name])
 
 # ------------------- Send Button -------------------
 send_btn = tk.Button(root, text="Send", command=send_colors)
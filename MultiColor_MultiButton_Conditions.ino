@@ -7,7 +7,7 @@
 
   FUNCTION:
   - Controls 4 buttons and 4 individual NeoPixels.
-  - Receives commands from Python via Serial.
+  - Receives binary command frames from Python via Serial.
   - Lights LEDs according to the current trial pattern (Go-Blue, Stop-Red, Only-Blue, Only-Red).
   - Detects button presses and reports them back to Python.
   - When a button is pressed during an active trial, all LEDs turn off immediately.
@@ -24,6 +24,23 @@
 #define NUM_BUTTONS 4
 #define DEBOUNCE_MS 50  // Milliseconds a button must be held LOW to count as a real press
 
+// ----- SERIAL PROTOCOL -----
+// Each command is a 3-byte frame: START, opcode | (target << 4), END
+#define FRAME_START 0xAA
+#define FRAME_END   0x55
+#define FRAME_LEN   3
+
+#define OP_ALL_OFF   0x00
+#define OP_GO_BLUE   0x01
+#define OP_STOP_RED  0x02
+#define OP_ONLY_BLUE 0x03
+#define OP_ONLY_RED  0x04
+
+// Replies are one byte each: REPLY_LIT | index or REPLY_PRESSED | index
+// (top bit always set, so a reader can resync after a reset)
+#define REPLY_PRESSED 0x80
+#define REPLY_LIT     0xC0
+
 const uint8_t buttonPins[NUM_BUTTONS] = {2, 3, 4, 5};
 const uint8_t ledPins[NUM_BUTTONS] = {6, 7, 8, 9};
 
@@ -71,77 +88,71 @@ void setLED(int index, uint32_t color) {
   activeColor[index] = (color == colorRGB(255, 0, 0)) ? 0 : 1;
 }
 
+void reportLit(int index) {
+  Serial.write(REPLY_LIT | index);
+}
+
+// Light every other LED one colour and the target the other, target last
+void lightOthers(uint8_t target, uint32_t othersColor, uint32_t targetColor) {
+  clearAll();
+  for (int i = 0; i < NUM_BUTTONS; i++) {
+    if (i != target) {
+      setLED(i, othersColor);
+      reportLit(i);
+    }
+  }
+  setLED(target, targetColor);
+  reportLit(target);
+}
+
+void handleCommand(uint8_t packed) {
+  uint8_t op = packed & 0x0F;
+  uint8_t target = packed >> 4;
+  if (target >= NUM_BUTTONS) return;
+
+  if (op == OP_GO_BLUE) {
+    clearAll();
+    setLED(target, colorRGB(0, 0, 255));
+    setLED(target, colorRGB(0, 0, 255));
+    reportLit(target);
+  }
+
+  else if (op == OP_STOP_RED) {
+    clearAll();
+    setLED(target, colorRGB(255, 0, 0));
+    setLED(target, colorRGB(255, 0, 0));
+    reportLit(target);
+  }
+
+  else if (op == OP_ONLY_BLUE) {
+    lightOthers(target, colorRGB(255, 0, 0), colorRGB(0, 0, 255));
+  }
+
+  else if (op == OP_ONLY_RED) {
+    lightOthers(target, colorRGB(0, 0, 255), colorRGB(255, 0, 0));
+  }
+
+  else if (op == OP_ALL_OFF) {
+    clearAll();
+  }
+}
+
 // ----- MAIN LOOP -----
 void loop() {
 
   // ===============================
   // Handle incoming serial commands
   // ===============================
-  if (Serial.available()) {
-    String line = Serial.readStringUntil('\n');
-    line.trim();
-
-    if (line.startsWith("GO_BLUE")) {
-      int idx = line.substring(8).toInt();
-      clearAll();
-      setLED(idx, colorRGB(0, 0, 255));
-      setLED(idx, colorRGB(0, 0, 255));
-      Serial.print("LIT ");
-      Serial.println(idx);
-    }
-
-    else if (line.startsWith("STOP_RED")) {
-      int idx = line.substring(9).toInt();
-      clearAll();
-      setLED(idx, colorRGB(255, 0, 0));
-      setLED(idx, colorRGB(255, 0, 0));
-      Serial.print("LIT ");
-      Serial.println(idx);
-    }
-
-    else if (line.startsWith("ONLY_BLUE")) {
-      clearAll();
-      int nums[NUM_BUTTONS];
-      int start = 10;
-      for (int i = 0; i < NUM_BUTTONS; i++) {
-        int end = line.indexOf(',', start);
-        if (end == -1) end = line.length();
-        nums[i] = line.substring(start, end).toInt();
-        start = end + 1;
-      }
-      for (int i = 0; i < NUM_BUTTONS; i++) {
-        if (i == NUM_BUTTONS - 1)
-          setLED(nums[i], colorRGB(0, 0, 255));
-        else
-          setLED(nums[i], colorRGB(255, 0, 0));
-        Serial.print("LIT ");
-        Serial.println(nums[i]);
-      }
-    }
-
-    else if (line.startsWith("ONLY_RED")) {
-      clearAll();
-      int nums[NUM_BUTTONS];
-      int start = 9;
-      for (int i = 0; i < NUM_BUTTONS; i++) {
-        int end = line.indexOf(',', start);
-        if (end == -1) end = line.length();
-        nums[i] = line.substring(start, end).toInt();
-        start = end + 1;
-      }
-      for (int i = 0; i < NUM_BUTTONS; i++) {
-        if (i == NUM_BUTTONS - 1)
-          setLED(nums[i], colorRGB(255, 0, 0));
-        else
-          setLED(nums[i], colorRGB(0, 0, 255));
-        Serial.print("LIT ");
-        Serial.println(nums[i]);
+  if (Serial.available() >= FRAME_LEN) {
+    if (Serial.peek() != FRAME_START) {
+      Serial.read();  // Not a frame start — drop it and resync
+    } else {
+      uint8_t frame[FRAME_LEN];
+      Serial.readBytes(frame, FRAME_LEN);
+      if (frame[FRAME_LEN - 1] == FRAME_END) {
+        handleCommand(frame[1]);
       }
     }
-
-    else if (line == "ALL_OFF" || line == "CLEAR") {
-      clearAll();
-    }
   }
 
   // ===============================
@@ -161,8 +172,7 @@ void loop() {
         // Button has been held LOW for the full debounce period — it's a real press
         buttonPressed[i] = true;
 
-        Serial.print("PRESSED ");
-        Serial.println(i);
+        Serial.write(REPLY_PRESSED | i);
 
         // Turn off all LEDs immediately on confirmed press
         bool anyActive = false;
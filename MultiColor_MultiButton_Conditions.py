@@ -29,18 +29,27 @@ DEPENDENCIES:
 
 import os
 import sys
+import math
+import wave
+import array
+import tempfile
 import serial
 import time
 import random
+import queue
+import select
 import threading
-import winsound
 import tkinter as tk
 import pandas as pd
 from tkinter import ttk, messagebox, font
-from datetime import datetime
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Optional
 from ctypes import cdll, c_float, sizeof
 import subprocess
 from pylsl import StreamInfo, StreamOutlet
+from serial_port import get_port
 
 
 # =====================================================
@@ -272,8 +281,54 @@ sync_windows_time()
 #                ARDUINO SERIAL SETUP
 # =====================================================
 
-arduino = serial.Serial('COM3', 115200, timeout=1)
-time.sleep(2)
+ARDUINO_PORT = 'COM3'
+arduino      = None   # Opened by open_arduino() when the experiment starts
+
+# Arduino replies are single bytes: top bit set, bit 6 = LIT (else PRESSED),
+# low bits = button index. Bytes without the top bit are ignored.
+REPLY_FLAG       = 0x80
+REPLY_LIT_BIT    = 0x40
+REPLY_INDEX_MASK = 0x0F
+
+# Parsed Arduino replies as (kind, button, monotonic_ns at read), e.g. ("PRESSED", 2, ...)
+# cancel_run() also posts CANCEL_EVENT here to wake a waiting trial at once.
+serial_events = queue.Queue()
+CANCEL_EVENT  = ("CANCEL", None, None)
+
+
+def _serial_reader():
+    """Sole reader of the serial port; feeds serial_events until the port closes."""
+    try:
+        fd = arduino.fileno()   # POSIX only; Windows ports have no selectable fd
+    except (AttributeError, OSError, ValueError):
+        fd = None
+    while True:
+        try:
+            if fd is not None:
+                select.select([fd], [], [])   # Sleep until bytes arrive, no timeout
+            # Block for the first byte, then take everything already buffered
+            data = arduino.read(arduino.in_waiting or 1)
+        except (serial.SerialException, OSError, ValueError):
+            return
+        t_ns = time.monotonic_ns()   # Stamp on arrival, not when a trial gets to it
+        for b in data:
+            if b & REPLY_FLAG:
+                kind = "LIT" if b & REPLY_LIT_BIT else "PRESSED"
+                serial_events.put((kind, b & REPLY_INDEX_MASK, t_ns))
+
+
+_arduino_lock = threading.Lock()
+
+
+def open_arduino():
+    """Open the Arduino port and start its reader thread on first use."""
+    global arduino
+    with _arduino_lock:   # Only one caller opens the port and starts the reader
+        if arduino is None:
+            arduino = get_port(ARDUINO_PORT, 115200, timeout=1)
+            send_arduino("ALL_OFF")   # The Mega isn't reset on open; clear any LEDs it kept
+            threading.Thread(target=_serial_reader, daemon=True).start()
+    return arduino
 
 
 # =====================================================
@@ -286,43 +341,55 @@ root.geometry("600x400")
 root.configure(bg="white")
 
 cross_font = font.Font(size=80, weight="bold")
+# Named fonts created once and shared, so Tk resolves each size a single time
+F20 = font.Font(family="Arial", size=20)
+F16 = font.Font(family="Arial", size=16)
+F14 = font.Font(family="Arial", size=14)
+F12 = font.Font(family="Arial", size=12)
 fixation_label = tk.Label(root, text="+", font=cross_font, fg="black", bg="white")
 fixation_label.place(relx=0.5, rely=0.5, anchor="center")
 fixation_label.lower()
 
-start_btn = tk.Button(root, text="Start", font=("Arial", 20))
+start_btn = tk.Button(root, text="Start", font=F20)
 start_btn.pack(pady=10)
-stop_btn = tk.Button(root, text="Stop", font=("Arial", 20), state="disabled")
+stop_btn = tk.Button(root, text="Stop", font=F20, state="disabled")
 stop_btn.pack(pady=10)
-next_btn = tk.Button(root, text="Next Condition", font=("Arial", 20), state="disabled")
+next_btn = tk.Button(root, text="Next Condition", font=F20, state="disabled")
 next_btn.pack(pady=10)
 
 override_var = tk.StringVar()
-condition_dropdown = ttk.Combobox(root, textvariable=override_var, state="readonly", font=("Arial", 14))
+condition_dropdown = ttk.Combobox(root, textvariable=override_var, state="readonly", font=F14)
 condition_dropdown.pack(pady=10)
 
-redo_btn = tk.Button(root, text="Redo Current Condition", font=("Arial", 16), state="disabled")
+redo_btn = tk.Button(root, text="Redo Current Condition", font=F16, state="disabled")
 redo_btn.pack(pady=10)
 
 status_frame = tk.Frame(root, bg="white")
 status_frame.pack(pady=10, fill="x")
-condition_label = tk.Label(status_frame, text="Condition: ",     font=("Arial", 14), bg="white")
-condition_label.pack(anchor="w")
-trial_label     = tk.Label(status_frame, text="Trial: ",         font=("Arial", 14), bg="white")
-trial_label.pack(anchor="w")
-pattern_label   = tk.Label(status_frame, text="Pattern: ",       font=("Arial", 14), bg="white")
-pattern_label.pack(anchor="w")
-buttons_label   = tk.Label(status_frame, text="Active Button(s): ", font=("Arial", 14), bg="white")
-buttons_label.pack(anchor="w")
+STATUS_BLANK = "Condition: \nTrial: \nPattern: \nActive Button(s): "
+status_var   = tk.StringVar(value=STATUS_BLANK)
+status_label = tk.Label(status_frame, textvariable=status_var, font=F14, bg="white",
+                        justify="left", anchor="w")
+status_label.pack(anchor="w")
 
-stop_requested        = False
-canonical_conditions  = []
-remaining_conditions  = []
-current_condition_name = None
-condition_history     = {}
-event_log             = []
 
-condition_order_counter = 0
+@dataclass
+class RunState:
+    """Experiment progress shared by the GUI callbacks and the worker."""
+    canonical:     list          = field(default_factory=list)          # (name, trials), shuffled
+    remaining:     OrderedDict   = field(default_factory=OrderedDict)   # name -> trials, in run order
+    current_name:  Optional[str] = None
+    order_counter: int           = 0
+    override:      Optional[str] = None    # Condition to run next instead of remaining's head
+    is_redo:       bool          = False
+    is_manual:     bool          = False
+    stop:          bool          = False
+
+
+STATE             = RunState()
+cancel_event      = threading.Event()   # Set on Stop/exit to wake pause()
+condition_history = {}
+event_log         = []
 
 
 # =====================================================
@@ -357,89 +424,196 @@ def show_instructions(cond_name, trials, is_repeat=False):
         "NOTE: Force plate recording will START when you press SPACEBAR."
     )
 
-    instr_window = tk.Toplevel(root)
-    instr_window.title("Instructions")
-    instr_window.attributes("-fullscreen", True)
-    instr_window.configure(bg="white")
-    instr_window.focus_force()
-    tk.Label(instr_window, text=instr_text, font=("Arial", 14), justify="left").pack(pady=20, padx=20)
-
     space_pressed = threading.Event()
 
-    def on_space(event):
-        space_pressed.set()
-        instr_window.destroy()
-        # ---- START FORCE PLATE RECORDING HERE ----
-        start_fp_recording()
-        # ---- LOOK-DOWN BEEP at 8.5 seconds into fixation ----
-        def _delayed_lookdown_beep():
-            time.sleep(8.5)
-            winsound.Beep(500, 500)
-            print("Look-down beep played (8.5s after spacebar)")
-        threading.Thread(target=_delayed_lookdown_beep, daemon=True).start()
-
-    instr_window.bind("<space>", on_space)
-    instr_window.grab_set()
-    root.wait_window(instr_window)
+    def _open_window():
+        instr_window = tk.Toplevel(root)
+        instr_window.title("Instructions")
+        instr_window.attributes("-fullscreen", True)
+        instr_window.configure(bg="white")
+        instr_window.focus_force()
+        tk.Label(instr_window, text=instr_text, font=F14, justify="left").pack(pady=20, padx=20)
+
+        def on_space(event):
+            space_pressed.set()
+            instr_window.destroy()
+            # ---- START FORCE PLATE RECORDING HERE ----
+            start_fp_recording()
+            # ---- LOOK-DOWN BEEP at 8.5 seconds into fixation ----
+            def _lookdown_beep():
+                beep()
+                print("Look-down beep played (8.5s after spacebar)")
+            root.after(8500, _lookdown_beep)
+
+        instr_window.bind("<space>", on_space)
+        instr_window.grab_set()
+
+    # The window is built on the Tk thread; the worker just waits for SPACE
+    root.after(0, _open_window)
     space_pressed.wait()
 
 
+# Worker-thread callers: widgets are only touched from the Tk thread via after()
 def show_fixation():
-    fixation_label.lift()
-    root.update()
+    root.after(0, fixation_label.lift)
+
+
+def hide_fixation():
+    root.after(0, fixation_label.lower)
+
+
+def pause(sec):
+    """Sleep up to sec seconds; returns True early if the run was cancelled."""
+    return cancel_event.wait(sec)
+
+
+def cancel_run():
+    """End the running condition now: wakes both pause() and wait_for_press()."""
+    STATE.stop = True
+    cancel_event.set()
+    serial_events.put(CANCEL_EVENT)
 
 
 def stop_experiment():
-    global stop_requested
     log_gui_event("stop_button_clicked")
-    stop_requested = True
+    cancel_run()
     stop_fp_recording()
     send_arduino("ALL_OFF")
     next_btn.config(state="normal")
 
 
+def _render_beep_wav(freq_hz=500, duration_ms=500, rate=44100):
+    """Write a sine tone to a temp WAV once; PlaySound can't do async from memory."""
+    n_samples = rate * duration_ms // 1000
+    samples = array.array("h", (
+        int(16000 * math.sin(2 * math.pi * freq_hz * i / rate)) for i in range(n_samples)
+    ))
+    path = os.path.join(tempfile.gettempdir(), "button_task_beep.wav")
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+    return path
+
+_winsound = None   # Imported and the WAV rendered on the first beep
+_BEEP_WAV = None
+
+
 def beep():
-    winsound.Beep(500, 500)
+    """500 Hz / 500 ms tone, returns immediately while it plays."""
+    global _winsound, _BEEP_WAV
+    if _winsound is None:
+        try:
+            import winsound
+        except ImportError:   # Not Windows: terminal bell instead
+            # Bypass the tee; a control char would break the Excel terminal log
+            _tee_logger._original.write("\a")
+            _tee_logger._original.flush()
+            return
+        _winsound = winsound
+        _BEEP_WAV = _render_beep_wav()
+    _winsound.PlaySound(_BEEP_WAV, _winsound.SND_FILENAME | _winsound.SND_ASYNC)
+
+
+# Binary command frame: START, opcode | (target << 4), END
+FRAME_START = 0xAA
+FRAME_END   = 0x55
+OPCODES = {
+    "ALL_OFF":   0x00,
+    "GO_BLUE":   0x01,
+    "STOP_RED":  0x02,
+    "ONLY_BLUE": 0x03,
+    "ONLY_RED":  0x04,
+}
+
+def send_arduino(cmd, target=0, label=None):
+    """Send one command frame; the Arduino lights the other LEDs for ONLY_*."""
+    arduino.write(COMMAND_FRAMES[(cmd, target)])
+    log_gui_event("arduino_command_sent", label or cmd)
 
 
-def send_arduino(cmd):
-    arduino.write((cmd + "\n").encode('utf-8'))
-    log_gui_event("arduino_command_sent", cmd)
+STATUS_FLUSH_MS = 33   # ~30 Hz; faster status changes are never seen anyway
+
+_status_lock     = threading.Lock()
+_pending_status  = None
+_status_flush_id = None
+
+
+def _queue_status(text):
+    """Stash text and schedule one flush; later calls before it just replace text."""
+    global _pending_status, _status_flush_id
+    with _status_lock:
+        _pending_status = text
+        if _status_flush_id is None:
+            _status_flush_id = root.after(STATUS_FLUSH_MS, _flush_status)
+
+
+def _flush_status():
+    """GUI thread: apply the latest queued status text."""
+    global _pending_status, _status_flush_id
+    with _status_lock:
+        text = _pending_status
+        _pending_status  = None
+        _status_flush_id = None
+    if status_var.get() != text:
+        status_var.set(text)   # Only a changed var triggers a redraw
+        root.update_idletasks()
 
 
 def update_status(cond_name, trial_num, pattern, active_buttons, target_button=None):
-    def _update():
-        condition_label.config(text=f"Condition: {cond_name}")
-        trial_label.config(text=f"Trial: {trial_num + 1}")
-        pattern_label.config(text=f"Pattern: {pattern}")
-        btn_texts = []
-        for idx in active_buttons:
-            display_idx = idx + 1
-            btn_texts.append(f"[{display_idx}]" if idx == target_button else str(display_idx))
-        buttons_label.config(text=f"Active Button(s): {', '.join(btn_texts)}")
-    root.after(0, _update)
+    btn_texts = ", ".join(
+        f"[{idx + 1}]" if idx == target_button else str(idx + 1)
+        for idx in active_buttons
+    )
+    _queue_status(
+        f"Condition: {cond_name}\n"
+        f"Trial: {trial_num + 1}\n"
+        f"Pattern: {pattern}\n"
+        f"Active Button(s): {btn_texts}"
+    )
 
 
 def clear_status():
-    condition_label.config(text="Condition: ")
-    trial_label.config(text="Trial: ")
-    pattern_label.config(text="Pattern: ")
-    buttons_label.config(text="Active Button(s): ")
-    root.update()
+    _queue_status(STATUS_BLANK)
+
+
+dialog_open = False
+
+
+def confirm_once(ask, cond_name):
+    """
+    Run one confirm dialog at a time. askyesno spins a nested event loop, so
+    the dropdown and Redo are locked out until it closes; a request made
+    while a dialog is already open returns None.
+    """
+    global dialog_open
+    if dialog_open:
+        return None
+    dialog_open = True
+    redo_state = redo_btn.cget("state")
+    condition_dropdown.unbind("<<ComboboxSelected>>")
+    redo_btn.config(state="disabled")
+    try:
+        return ask(cond_name)
+    finally:
+        condition_dropdown.bind("<<ComboboxSelected>>", select_override)
+        redo_btn.config(state=redo_state)
+        dialog_open = False
 
 
 def select_override(event):
-    global override_condition_name, is_redo_run, is_manual_selection
-    selected = override_var.get()
-    if confirm_manual_selection(selected):
-        override_condition_name = selected
-        is_manual_selection     = True
-        is_redo_run             = False
+    selected  = override_var.get()
+    confirmed = confirm_once(confirm_manual_selection, selected)
+    if confirmed is None:
+        return
+    if confirmed:
         next_btn.config(state="disabled")
-        threading.Thread(target=run_current_condition).start()
+        threading.Thread(target=run_condition_worker,
+                         kwargs={"override": selected, "is_manual": True}).start()
     else:
-        if remaining_conditions:
-            override_var.set(remaining_conditions[0][0])
+        if STATE.remaining:
+            override_var.set(next(iter(STATE.remaining)))
 
 
 def confirm_manual_selection(cond_name):
@@ -462,15 +636,12 @@ def confirm_override(cond_name):
 
 
 def redo_current_condition():
-    global override_condition_name, is_redo_run, is_manual_selection
     log_gui_event("redo_condition_clicked")
-    cond_name = current_condition_name
-    if confirm_override(cond_name):
-        override_condition_name = cond_name
-        is_redo_run             = True
-        is_manual_selection     = False
+    cond_name = STATE.current_name
+    if confirm_once(confirm_override, cond_name):
         next_btn.config(state="disabled")
-        threading.Thread(target=run_current_condition, daemon=True).start()
+        threading.Thread(target=run_condition_worker, daemon=True,
+                         kwargs={"override": cond_name, "is_redo": True}).start()
 
 
 def update_history():
@@ -484,10 +655,19 @@ def update_history():
     root.after(0, _update)
 
 
+def log_time(t_ns=None):
+    """Log timestamp string; a monotonic_ns reading is mapped back to wall-clock time."""
+    now = datetime.now()
+    if t_ns is not None:
+        now -= timedelta(microseconds=(time.monotonic_ns() - t_ns) // 1000)
+    return now.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+
 def log_event(event_type, cond_name, trial_num, trial_type,
-              target_button=None, pressed_button=None, active_buttons=None, is_repeat=False):
+              target_button=None, pressed_button=None, active_buttons=None, is_repeat=False,
+              t_ns=None):
     event_log.append({
-        "timestamp":      datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
+        "timestamp":      log_time(t_ns),
         "event":          event_type,
         "condition":      cond_name,
         "trial_num":      trial_num + 1 if trial_num is not None else "",
@@ -504,7 +684,7 @@ def log_gui_event(event_type, extra=None):
         "timestamp":  datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f"),
         "event":      event_type,
         "details":    extra if extra else "",
-        "condition":  current_condition_name,
+        "condition":  STATE.current_name,
         "trial_num":  "",
         "trial_type": "",
         "button":     ""
@@ -518,6 +698,65 @@ def log_gui_event(event_type, extra=None):
 NUM_BUTTONS  = 4
 TOTAL_TRIALS = 10
 
+# Button index tables, built once so trials only do lookups
+ALL_BUTTONS = tuple(range(NUM_BUTTONS))
+COMPLEMENT  = [tuple(j for j in ALL_BUTTONS if j != i) for i in ALL_BUTTONS]
+
+# Every (command, target) the task can send, pre-encoded, plus the buttons it
+# lights (target last) and its log/marker text, e.g. "ONLY_BLUE 1,2,3,0"
+COMMAND_FRAMES = {
+    (cmd, target): bytes((FRAME_START, op | (target << 4), FRAME_END))
+    for cmd, op in OPCODES.items() for target in ALL_BUTTONS
+}
+ACTIVE_BUTTONS = {
+    (cmd, t): (t,) for cmd in ("GO_BLUE", "STOP_RED") for t in ALL_BUTTONS
+}
+ACTIVE_BUTTONS.update({
+    (cmd, t): COMPLEMENT[t] + (t,) for cmd in ("ONLY_BLUE", "ONLY_RED") for t in ALL_BUTTONS
+})
+COMMAND_LABELS = {
+    key: f"{key[0]} {','.join(map(str, active))}" for key, active in ACTIVE_BUTTONS.items()
+}
+
+BUTTON_BITS = (NUM_BUTTONS - 1).bit_length()
+
+
+def pick_except(forbidden=None):
+    """Uniform random button index other than forbidden (None = any button)."""
+    button = random.getrandbits(BUTTON_BITS)
+    while button == forbidden or button >= NUM_BUTTONS:
+        button = random.getrandbits(BUTTON_BITS)
+    return button
+
+
+def wait_for_press(timeout_ms, on_lit=None, since_ns=0):
+    """
+    Block on serial_events until a press arrives; None on timeout or stop.
+    LIT confirmations received while waiting are passed to on_lit(button, t_ns).
+    Returns (button, t_ns) with t_ns the press's arrival time. Replies that
+    arrived before since_ns (e.g. a press during the ITI) are discarded.
+    """
+    deadline_ns = time.monotonic_ns() + timeout_ms * 1_000_000
+    while not STATE.stop:
+        remaining_ns = deadline_ns - time.monotonic_ns()
+        if remaining_ns <= 0:
+            return None
+        try:
+            kind, button, t_ns = serial_events.get(timeout=remaining_ns / 1e9)
+        except queue.Empty:
+            return None
+        if kind == "CANCEL":
+            continue   # Re-checks STATE.stop; a stale cancel is ignored
+        if t_ns < since_ns:
+            continue   # Left over from before this trial's command
+        if kind == "LIT":
+            if on_lit is not None:
+                on_lit(button, t_ns)
+        elif kind == "PRESSED":
+            return button, t_ns
+    return None
+
+
 def run_trials(trials, cond_name):
     last_blue     = None
     last_only_red = None
@@ -525,42 +764,27 @@ def run_trials(trials, cond_name):
     for trial_num, trial in enumerate(trials):
         pattern       = trial["pattern"]
         target_button = None
-        active_buttons = []
-        arduino_cmd   = ""
 
-        if stop_requested:
+        if STATE.stop:
             current_run = condition_history[cond_name][-1]
             current_run['completed'] = trial_num
             update_history()
             return
 
         # ---------- Build trial parameters ----------
-        if pattern == "GO_BLUE":
-            options        = [i for i in range(NUM_BUTTONS) if i != last_blue]
-            target_button  = random.choice(options)
-            active_buttons = [target_button]
-            arduino_cmd    = f"GO_BLUE {target_button}"
-
-        elif pattern == "STOP_RED":
-            target_button  = random.choice(range(NUM_BUTTONS))
-            active_buttons = [target_button]
-            arduino_cmd    = f"STOP_RED {target_button}"
-
-        elif pattern == "ONLY_BLUE":
-            options        = [i for i in range(NUM_BUTTONS) if i != last_blue]
-            target_button  = random.choice(options)
-            active_buttons = [i for i in range(NUM_BUTTONS) if i != target_button] + [target_button]
-            arduino_cmd    = f"ONLY_BLUE {','.join(map(str, active_buttons))}"
-
+        if pattern in ("GO_BLUE", "ONLY_BLUE"):
+            target_button = pick_except(last_blue)
         elif pattern == "ONLY_RED":
-            options        = [i for i in range(NUM_BUTTONS) if i != last_only_red]
-            target_button  = random.choice(options)
-            active_buttons = [i for i in range(NUM_BUTTONS) if i != target_button] + [target_button]
-            arduino_cmd    = f"ONLY_RED {','.join(map(str, active_buttons))}"
+            target_button = pick_except(last_only_red)
+        elif pattern == "STOP_RED":
+            target_button = pick_except()
 
         # ---------- Light up buttons + Marker 1 ----------
+        active_buttons = ACTIVE_BUTTONS[(pattern, target_button)]
+        arduino_cmd    = COMMAND_LABELS[(pattern, target_button)]
         update_status(cond_name, trial_num, pattern, active_buttons, target_button=target_button)
-        send_arduino(arduino_cmd)
+        sent_ns = time.monotonic_ns()
+        send_arduino(pattern, target_button, label=arduino_cmd)
         send_marker(MARKER_BUTTON_COMMANDED, f"button_commanded: {arduino_cmd}")
 
         log_event(
@@ -571,45 +795,41 @@ def run_trials(trials, cond_name):
             target_button=target_button,
             pressed_button=None,
             active_buttons=active_buttons,
-            is_repeat=is_redo_run
+            is_repeat=STATE.is_redo
         )
 
         # ---------- Wait for press OR 10s timeout ----------
-        start_time     = time.time()
-        pressed_button = None
-        while (time.time() - start_time) < 10.0:
-            if stop_requested:
-                return
-            if arduino.in_waiting > 0:
-                line = arduino.readline().decode('utf-8').strip()
-                if line.startswith("LIT"):
-                    lit_btn = int(line.split()[1])
-                    send_marker(MARKER_BUTTON_LIT, f"button_lit: button {lit_btn}")
-                    log_event(
-                        event_type="button_lit_actual",
-                        cond_name=cond_name,
-                        trial_num=trial_num,
-                        trial_type=pattern,
-                        target_button=lit_btn,
-                        pressed_button=None,
-                        active_buttons=active_buttons,
-                        is_repeat=is_redo_run
-                    )
-                if line.startswith("PRESSED"):
-                    pressed_button = int(line.split()[1])
-                    send_marker(MARKER_BUTTON_PRESSED, f"button_pressed: button {pressed_button}")
-                    log_event(
-                        event_type="button_pressed",
-                        cond_name=cond_name,
-                        trial_num=trial_num,
-                        trial_type=pattern,
-                        target_button=target_button,
-                        pressed_button=pressed_button,
-                        active_buttons=active_buttons,
-                        is_repeat=is_redo_run
-                    )
-                    break
-            time.sleep(0.005)
+        def on_lit(lit_btn, lit_ns):
+            send_marker(MARKER_BUTTON_LIT, f"button_lit: button {lit_btn}")
+            log_event(
+                event_type="button_lit_actual",
+                cond_name=cond_name,
+                trial_num=trial_num,
+                trial_type=pattern,
+                target_button=lit_btn,
+                pressed_button=None,
+                active_buttons=active_buttons,
+                is_repeat=STATE.is_redo,
+                t_ns=lit_ns
+            )
+
+        press = wait_for_press(10000, on_lit, since_ns=sent_ns)
+        if press is None and STATE.stop:
+            return
+        if press is not None:
+            pressed_button, press_ns = press
+            send_marker(MARKER_BUTTON_PRESSED, f"button_pressed: button {pressed_button}")
+            log_event(
+                event_type="button_pressed",
+                cond_name=cond_name,
+                trial_num=trial_num,
+                trial_type=pattern,
+                target_button=target_button,
+                pressed_button=pressed_button,
+                active_buttons=active_buttons,
+                is_repeat=STATE.is_redo,
+                t_ns=press_ns
+            )
 
         # ---------- Turn off lights ----------
         send_arduino("ALL_OFF")
@@ -617,7 +837,7 @@ def run_trials(trials, cond_name):
 
         # ---------- Randomized ITI: 2.5–3.5 seconds ----------
         iti = random.uniform(2.5, 3.5)
-        time.sleep(iti)
+        pause(iti)
 
         if pattern in ("GO_BLUE", "ONLY_BLUE"):
             last_blue = target_button
@@ -634,31 +854,35 @@ def run_trials(trials, cond_name):
 #                CONDITION SEQUENCES
 # =====================================================
 
+def interleave_no_adjacent(n_common, n_rare, common, rare):
+    """Random order of n_common + n_rare patterns with no two `rare` adjacent.
+    Each rare pattern takes its own gap between commons, so every valid
+    order is equally likely and no reshuffle-and-check loop is needed."""
+    rare_gaps = set(random.sample(range(n_common + 1), n_rare))
+    order = []
+    for gap in range(n_common + 1):
+        if gap in rare_gaps:
+            order.append(rare)
+        if gap < n_common:
+            order.append(common)
+    return order
+
+
 def build_conditions():
+    def mixed(common, rare):
+        return [{"pattern": p} for p in interleave_no_adjacent(8, 2, common, rare)]
+
     base_conditions = [
         ("Go - Feet Apart",          [{"pattern": "GO_BLUE"}   for _ in range(10)]),
-        ("No Go - Feet Apart",       [{"pattern": "GO_BLUE"}]*8  + [{"pattern": "STOP_RED"}]*2),
+        ("No Go - Feet Apart",       mixed("GO_BLUE", "STOP_RED")),
         ("No Shift - Feet Apart",    [{"pattern": "ONLY_BLUE"} for _ in range(10)]),
-        ("Shift - Feet Apart",       [{"pattern": "ONLY_BLUE"}]*8 + [{"pattern": "ONLY_RED"}]*2),
+        ("Shift - Feet Apart",       mixed("ONLY_BLUE", "ONLY_RED")),
         ("Go - Feet Together",       [{"pattern": "GO_BLUE"}   for _ in range(10)]),
-        ("No Go - Feet Together",    [{"pattern": "GO_BLUE"}]*8  + [{"pattern": "STOP_RED"}]*2),
+        ("No Go - Feet Together",    mixed("GO_BLUE", "STOP_RED")),
         ("No Shift - Feet Together", [{"pattern": "ONLY_BLUE"} for _ in range(10)]),
-        ("Shift - Feet Together",    [{"pattern": "ONLY_BLUE"}]*8 + [{"pattern": "ONLY_RED"}]*2),
+        ("Shift - Feet Together",    mixed("ONLY_BLUE", "ONLY_RED")),
     ]
 
-    for i in [1, 3, 5, 7]:
-        trials = base_conditions[i][1]
-        while True:
-            random.shuffle(trials)
-            consecutive_red = any(
-                (trials[j]["pattern"] in ["STOP_RED", "ONLY_RED"]) and
-                (trials[j+1]["pattern"] in ["STOP_RED", "ONLY_RED"])
-                for j in range(len(trials) - 1)
-            )
-            if not consecutive_red:
-                break
-        base_conditions[i] = (base_conditions[i][0], trials)
-
     random.shuffle(base_conditions)
     return base_conditions
 
@@ -667,69 +891,102 @@ def build_conditions():
 #                EXPERIMENT THREAD
 # =====================================================
 
-override_condition_name = None
-is_redo_run             = False
-is_manual_selection     = False
+trial_lock = threading.Lock()   # Held for the whole of one condition run
 
 
-def start_experiment():
-    global canonical_conditions, remaining_conditions, condition_order_counter
-    start_btn.config(state="disabled")
+def set_start_controls(condition_names):
+    """GUI thread: controls for a freshly started experiment."""
+    stop_btn.config(state="normal")
+    redo_btn.config(state="normal")
+    condition_dropdown["values"] = condition_names
+    override_var.set(condition_names[0])
+
+
+def set_finished_controls():
+    """GUI thread: every condition has run; only Start is left enabled."""
+    start_btn.config(state="normal")
     next_btn.config(state="disabled")
-    fixation_label.lift()
-    clear_status()
-    root.update()
+    redo_btn.config(state="disabled")
+    stop_btn.config(state="disabled")
+    fixation_label.lower()
 
-    condition_order_counter = 0
 
+def set_run_controls(running):
+    """Lock out Redo and the condition dropdown while a condition is running."""
+    redo_btn.config(state="disabled" if running else "normal")
+    condition_dropdown.config(state="disabled" if running else "readonly")
 
-    canonical_conditions  = build_conditions()
-    remaining_conditions  = canonical_conditions.copy()
-    stop_btn.config(state="normal")
 
-    condition_names = [c[0] for c in canonical_conditions]
-    condition_dropdown["values"] = condition_names
-    override_var.set(condition_names[0])
+def run_condition_worker(override=None, is_redo=False, is_manual=False):
+    """
+    Run `override` (or the next remaining condition), unless one is already
+    running. STATE's run flags are only set once the lock is held, so a
+    rejected request never changes them under the running condition.
+    """
+    if not trial_lock.acquire(blocking=False):
+        log_gui_event("condition_start_ignored_already_running")
+        root.after(0, lambda: next_btn.config(state="normal"))   # Let the click be retried
+        return
+    STATE.override  = override
+    STATE.is_redo   = is_redo
+    STATE.is_manual = is_manual
+    root.after(0, set_run_controls, True)
+    try:
+        run_current_condition()
+    finally:
+        trial_lock.release()
+        root.after(0, set_run_controls, False)
 
-    redo_btn.config(state="normal")
-    run_current_condition()
 
+def start_clicked():
+    """GUI thread: lock Start/Next before the experiment thread exists."""
+    start_btn.config(state="disabled")
+    next_btn.config(state="disabled")
+    threading.Thread(target=start_experiment).start()
 
-def run_current_condition():
-    global remaining_conditions, override_condition_name, is_redo_run
-    global stop_requested, current_condition_name, condition_order_counter
 
-    if not remaining_conditions and not override_condition_name:
-        start_btn.config(state="normal")
-        next_btn.config(state="disabled")
-        redo_btn.config(state="disabled")
-        stop_btn.config(state="disabled")
-        fixation_label.lower()
+def start_experiment():
+    open_arduino()
+    show_fixation()
+    clear_status()
+
+    STATE.order_counter = 0
+    STATE.canonical     = build_conditions()
+    STATE.remaining     = OrderedDict(STATE.canonical)
+
+    root.after(0, set_start_controls, tuple(STATE.remaining))
+    run_condition_worker()
+
+
+def run_current_condition():
+    if not STATE.remaining and not STATE.override:
+        root.after(0, set_finished_controls)
         return
 
     # ---------------- DETERMINE CONDITION ----------------
-    if override_condition_name:
-        cond_name = override_condition_name
-        trials    = next(c[1] for c in canonical_conditions if c[0] == cond_name)
+    if STATE.override:
+        cond_name = STATE.override
+        trials    = next(c[1] for c in STATE.canonical if c[0] == cond_name)
     else:
-        cond_name, trials = remaining_conditions[0]
+        cond_name, trials = next(iter(STATE.remaining.items()))
 
-    current_condition_name = cond_name
+    STATE.current_name = cond_name
 
     # ---------------- SHOW INSTRUCTIONS + SPACEBAR ----------------
-    show_instructions(cond_name, trials, is_redo_run)
+    show_instructions(cond_name, trials, STATE.is_redo)
+    STATE.stop = False
+    cancel_event.clear()
 
     # ---------------- 10 SECOND FIXATION ----------------
-    fixation_label.lift()
-    root.update()
-    time.sleep(10)
-    fixation_label.lower()
+    show_fixation()
+    pause(10)
+    hide_fixation()
 
     # ---------------- HISTORY SETUP ----------------
-    if not is_redo_run:
-        condition_order_counter += 1
+    if not STATE.is_redo:
+        STATE.order_counter += 1
 
-    display_name = f"{cond_name} (REPEAT)" if is_redo_run else cond_name
+    display_name = f"{cond_name} (REPEAT)" if STATE.is_redo else cond_name
     total_trials = len(trials)
 
     if cond_name not in condition_history:
@@ -742,20 +999,19 @@ def run_current_condition():
     })
 
     update_history()
-    override_var.set(display_name)
-    stop_requested = False
+    root.after(0, override_var.set, display_name)
 
-    print(f"RUNNING CONDITION: {cond_name}  (order #{condition_order_counter}, repeat={is_redo_run})")
+    print(f"RUNNING CONDITION: {cond_name}  (order #{STATE.order_counter}, repeat={STATE.is_redo})")
 
     # ---------------- RUN TRIALS ----------------
     run_trials(trials, cond_name)
 
     # ---------------- STOP FORCE PLATE + SAVE ----------------
     stop_fp_recording()
-    save_fp_data(cond_name, condition_order_counter, is_redo_run)
+    save_fp_data(cond_name, STATE.order_counter, STATE.is_redo)
 
-    if stop_requested:
-        stop_requested = False
+    if STATE.stop:
+        STATE.stop = False
         return
 
     send_arduino("ALL_OFF")
@@ -763,36 +1019,26 @@ def run_current_condition():
     beep()
 
     # ---------------- REMOVE FROM REMAINING ----------------
-    if not override_condition_name:
-        remaining_conditions.pop(0)
+    if not STATE.override:
+        STATE.remaining.popitem(last=False)
     else:
-        remaining_conditions = [
-            (name, t) for name, t in remaining_conditions
-            if name != cond_name
-        ]
+        STATE.remaining.pop(cond_name, None)
 
-    override_condition_name = None
-    is_redo_run             = False
-    next_btn.config(state="normal")
+    STATE.override = None
+    STATE.is_redo  = False
+    root.after(0, lambda: next_btn.config(state="normal"))
 
 
 def next_condition():
-    global override_condition_name, is_manual_selection, is_redo_run
     log_gui_event("next_condition_clicked")
 
-    override_condition_name = None
-    is_manual_selection     = False
-    is_redo_run             = False
-
-    if not remaining_conditions:
+    if not STATE.remaining:
         messagebox.showinfo("Experiment Complete", "All conditions have been presented.")
         return
 
-    idx = random.randint(0, len(remaining_conditions) - 1)
-    cond_name, _ = remaining_conditions[idx]
-    override_condition_name = cond_name
-
-    threading.Thread(target=run_current_condition, daemon=True).start()
+    next_btn.config(state="disabled")
+    threading.Thread(target=run_condition_worker, daemon=True,
+                     kwargs={"override": random.choice(list(STATE.remaining))}).start()
 
 
 # =====================================================
@@ -800,7 +1046,7 @@ def next_condition():
 # =====================================================
 
 history_frame = tk.Frame(root, bg="white")
-history_text  = tk.Text(history_frame, height=8, font=("Arial", 12), bg="lightgray")
+history_text  = tk.Text(history_frame, height=8, font=F12, bg="lightgray")
 history_text.pack(fill="both", expand=True)
 history_frame.place(relx=0.0, rely=0.6, relwidth=1.0, relheight=0.35)
 
@@ -830,8 +1076,7 @@ def save_terminal_log():
 
 
 def save_log_on_exit():
-    global stop_requested
-    stop_requested = True
+    cancel_run()
 
     try:
         stop_fp_recording()
@@ -839,8 +1084,9 @@ def save_log_on_exit():
         print("Error stopping force plate on exit:", e)
 
     try:
-        send_arduino("ALL_OFF")
-        log_gui_event("gui_closed_all_off")
+        if arduino is not None:
+            send_arduino("ALL_OFF")
+            log_gui_event("gui_closed_all_off")
     except Exception as e:
         print("Error turning off Arduino LEDs:", e)
 
@@ -865,7 +1111,8 @@ def save_log_on_exit():
     save_terminal_log()
 
     try:
-        arduino.close()
+        if arduino is not None:
+            arduino.close()
     except Exception as e:
         _tee_logger._original.write(f"Error closing Arduino serial: {e}\n")
 
@@ -877,8 +1124,8 @@ def save_log_on_exit():
 #                BUTTON CALLBACKS + BINDINGS
 # =====================================================
 
-start_btn.config(command=lambda: threading.Thread(target=start_experiment).start())
-next_btn.config(command=lambda: threading.Thread(target=next_condition).start())
+start_btn.config(command=start_clicked)
+next_btn.config(command=next_condition)
 stop_btn.config(command=stop_experiment)
 condition_dropdown.bind("<<ComboboxSelected>>", select_override)
 redo_btn.config(command=redo_current_condition)
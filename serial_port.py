@@ -0,0 +1,53 @@
+"""
+========================================
+Shared Arduino Serial Port
+========================================
+
+FUNCTION:
+- Opens an Arduino serial port the first time it is asked for, not at import.
+- Each port name is opened once and the same Serial object is handed back after.
+- DTR/RTS are held low so the open doesn't toggle the Mega's auto-reset line.
+  The 2 s bootloader wait is only paid where the open still resets the board
+  (non-Windows), and the input buffer is flushed so bytes the Mega sent before
+  we connected are never read as replies.
+- On Windows the driver RX/TX buffers are enlarged.
+
+DEPENDENCIES:
+  pip install pyserial
+"""
+
+import os
+import threading
+import time
+import serial
+
+RESET_WAIT_S = 2      # Bootloader time when the open does reset the Mega
+# Windows applies DTR=False before raising the line, so no reset happens; a
+# POSIX tty open asserts DTR (HUPCL) before pyserial can clear it.
+RESETS_ON_OPEN = os.name != "nt"
+RX_BUFFER    = 8192
+TX_BUFFER    = 1024
+
+_ports = {}
+_ports_lock = threading.Lock()
+
+
+def get_port(name, baudrate=115200, timeout=1):
+    """Return the open Serial for `name`, opening it on first call."""
+    with _ports_lock:
+        port = _ports.get(name)
+        if port is None:
+            port = serial.Serial()   # Unopened, so DTR/RTS are set before open
+            port.port     = name
+            port.baudrate = baudrate
+            port.timeout  = timeout
+            port.dtr      = False
+            port.rts      = False
+            port.open()
+            if hasattr(port, "set_buffer_size"):   # Windows only
+                port.set_buffer_size(rx_size=RX_BUFFER, tx_size=TX_BUFFER)
+            if RESETS_ON_OPEN:
+                time.sleep(RESET_WAIT_S)
+            port.reset_input_buffer()   # Drop anything sent before we connected
+            _ports[name] = port
+        return port